@@ -9,90 +9,505 @@ import json
 import os
 import argparse
 import sys
+import gc
 import glob
-from typing import Dict, Any, List
+import gzip
+import xml.parsers.expat
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from types import MappingProxyType
+from typing import Dict, Any, List, Iterable, Iterator, Optional, Tuple
+
+try:
+    from lxml import etree as LET
+except ImportError:
+    LET = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Exceptions raised for malformed XML by the available parser backends
+XML_PARSE_ERRORS = (ET.ParseError, xml.parsers.expat.ExpatError) + (
+    (LET.XMLSyntaxError,) if LET is not None else ()
+)
+
+# Parser backends accepted by MISMOXMLToJSONParser
+BACKENDS = ('iterparse', 'sax')
+
+# Structured loan data sections and their key paths from the document root.
+# Paths alternate MISMO container keys (e.g. DEALS) with the item key they hold
+# (e.g. DEAL); 'first' sections keep the first item, 'all' sections keep every
+# item as a list.
+LOAN_DATA_SECTIONS = (
+    ('message_info', 'first', ('ABOUT_VERSIONS', 'ABOUT_VERSION')),
+    ('deal_info', 'first', ('DEAL_SETS', 'DEAL_SET', 'DEALS', 'DEAL')),
+    ('collaterals', 'all', ('DEAL_SETS', 'DEAL_SET', 'DEALS', 'DEAL', 'COLLATERALS', 'COLLATERAL')),
+    ('loans', 'all', ('DEAL_SETS', 'DEAL_SET', 'DEALS', 'DEAL', 'LOANS', 'LOAN')),
+    ('parties', 'all', ('DEAL_SETS', 'DEAL_SET', 'DEALS', 'DEAL', 'PARTIES', 'PARTY')),
+    ('relationships', 'all', ('RELATIONSHIPS', 'RELATIONSHIP')),
+)
+
+
+# List normalizations unrolled into the generated extractor. An exact type
+# check skips isinstance's subclass machinery; parsed data only holds plain lists.
+_AS_LIST = '{0} if type({0}) is list else [{0}]'
+_FIRST = '{0}[0] if type({0}) is list else {0}'
+
+
+def _compile_loan_extractor(sections: Tuple[Tuple[str, str, Tuple[str, ...]], ...]):
+    """
+    Generate a function that copies the given sections out of parsed MISMO data
+    
+    Paths are merged into a trie so shared prefixes are walked once, and the
+    list normalization for each item key is unrolled into straight-line code.
+    
+    Args:
+        sections: (section name, 'first' | 'all', key path) tuples
+        
+    Returns:
+        A function extract(json_data, loan_data) that fills loan_data in place
+    """
+    trie = {}
+    for name, kind, path in sections:
+        if not path or len(path) % 2:
+            raise ValueError(f"Path for section '{name}' must alternate container and item keys")
+        node = trie
+        for key in path[:-1]:
+            node = node.setdefault(key, ({}, []))[0]
+        node.setdefault(path[-1], ({}, []))[1].append((name, kind))
+    
+    lines = [
+        'def extract(json_data, loan_data):',
+        '    if not isinstance(json_data, dict):',
+        '        return',
+    ]
+    
+    def emit(node, parent, depth, pad):
+        for key, (children, ends) in node.items():
+            var = f'x{depth}'
+            lines.append(f'{pad}{var} = {parent}.get({key!r})')
+            if depth % 2:  # Item key: may repeat, so it can be a list
+                for name, kind in ends:
+                    if kind == 'all':
+                        lines.append(f'{pad}if {var} is not None:')
+                        lines.append(f'{pad}    loan_data[{name!r}] = {_AS_LIST.format(var)}')
+                if children or any(kind == 'first' for _, kind in ends):
+                    lines.append(f'{pad}{var} = {_FIRST.format(var)}')
+                for name, kind in ends:
+                    if kind == 'first':
+                        lines.append(f'{pad}if {var} is not None:')
+                        lines.append(f'{pad}    loan_data[{name!r}] = {var}')
+            if children:
+                lines.append(f'{pad}if isinstance({var}, dict):')
+                emit(children, var, depth + 1, pad + '    ')
+    
+    emit(trie, 'json_data', 0, '    ')
+    namespace = {}
+    exec(compile('\n'.join(lines), '<loan data extractor>', 'exec'), namespace)
+    return namespace['extract']
+
+
+@contextmanager
+def _gc_paused():
+    """
+    Disable the cyclic garbage collector for the duration of the block
+    
+    Everything built while parsing stays alive, so collections during the
+    build would only rescan a growing, acyclic tree.
+    """
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+
+def _node_value(text: Optional[str], children: Dict[str, list],
+                attributes: Optional[Dict[str, str]] = None) -> Any:
+    """
+    Collapse an element's text, grouped children and attributes into its JSON value
+    
+    Args:
+        text: Raw text content of the element, if any
+        children: Child tag -> list of child values, in document order
+        attributes: Attributes with cleaned names, if the element has any
+        
+    Returns:
+        The text for leaf nodes, a dictionary otherwise, or "" when empty
+    """
+    # Whitespace-only text (indentation) is rejected without a stripped copy;
+    # only text that is kept gets stripped
+    if text is None or text.isspace():
+        text = ''
+    else:
+        text = text.strip()
+    
+    # Add text content if present and not empty
+    if text and not children and not attributes:  # Leaf node
+        return text
+    
+    result = {}
+    if attributes:
+        result['@attributes'] = attributes
+    if text:  # Has text alongside children or attributes
+        result['#text'] = text
+    # Children are always collected in lists; only repeated tags stay lists
+    for child_tag, values in children.items():
+        result[child_tag] = values[0] if len(values) == 1 else values
+    # If no attributes, text, or children, use an empty string
+    return result if result else ""
+
+
+def _root_value(root_accumulator: Dict[str, list]) -> Any:
+    """
+    Return the root element's value once a builder has closed every element
+    
+    Args:
+        root_accumulator: The bottom accumulator, holding exactly one root value
+        
+    Returns:
+        The root element's value
+    """
+    (root_values,) = root_accumulator.values()
+    return root_values[0]
+
+
+class _SaxBuilder:
+    """Builds the same dictionary as the iterparse backend from expat callbacks"""
+    
+    def __init__(self, tag_cache: Dict[str, str], clean_tag_name):
+        self.tag_cache = tag_cache
+        self.clean_tag_name = clean_tag_name
+        # Same accumulator stack as MISMOXMLToJSONParser._build_dict
+        self.stack = [{}]
+        # Text chunks of each open element, joined once its first child starts
+        self.text = []
+        # Cleaned attributes of each open element (None when it has none)
+        self.attributes = []
+    
+    def parse(self, source) -> Any:
+        """
+        Parse a binary file object and return the root element's value
+        
+        Args:
+            source: Binary file object to read from
+            
+        Returns:
+            Dictionary representation of the root element
+        """
+        parser = xml.parsers.expat.ParserCreate(namespace_separator='}')
+        parser.buffer_text = True
+        parser.StartElementHandler = self.start
+        parser.EndElementHandler = self.end
+        parser.CharacterDataHandler = self.chars
+        parser.ParseFile(source)
+        
+        return _root_value(self.stack[0])
+    
+    def start(self, name: str, attrs: Dict[str, str]) -> None:
+        text = self.text
+        # Only text before the first child counts, as with ElementTree's .text
+        if text and type(text[-1]) is list:
+            text[-1] = ''.join(text[-1])
+        text.append([])
+        self.stack.append({})
+        if attrs:
+            tag_cache_get = self.tag_cache.get
+            clean_tag_name = self.clean_tag_name
+            attrs = {tag_cache_get(k) or clean_tag_name(k): v for k, v in attrs.items()}
+        self.attributes.append(attrs or None)
+    
+    def end(self, name: str) -> None:
+        text = self.text.pop()
+        if type(text) is list:
+            text = ''.join(text)
+        value = _node_value(text, self.stack.pop(), self.attributes.pop())
+        # Namespaced names arrive as 'uri}local'
+        tag = self.tag_cache.get(name) or self.clean_tag_name(name)
+        self.stack[-1].setdefault(tag, []).append(value)
+    
+    def chars(self, data: str) -> None:
+        text = self.text[-1]
+        if type(text) is list:
+            text.append(data)
 
 
 class MISMOXMLToJSONParser:
     """Parses MISMO XML to JSON format"""
     
-    def __init__(self):
-        self.namespaces = {
-            'mismo': 'http://www.mismo.org/residential/2009/schemas',
-            'xlink': 'http://www.w3.org/1999/xlink',
-            'xsi': 'http://www.w3.org/2001/XMLSchema-instance'
-        }
+    __slots__ = ('backend', '_tag_cache')
+    
+    # Well-known MISMO namespace prefixes (tags are cleaned without consulting these)
+    NAMESPACES = MappingProxyType({
+        'mismo': 'http://www.mismo.org/residential/2009/schemas',
+        'xlink': 'http://www.w3.org/1999/xlink',
+        'xsi': 'http://www.w3.org/2001/XMLSchema-instance'
+    })
     
-    def parse_xml_to_json(self, xml_file_path: str, output_file_path: str) -> None:
+    # Straight-line extractor generated once from LOAN_DATA_SECTIONS
+    _extract_loan_sections = staticmethod(_compile_loan_extractor(LOAN_DATA_SECTIONS))
+    # Subtrees that parse_xml_to_structured needs to build
+    _LOAN_DATA_PATHS = frozenset(path for _, _, path in LOAN_DATA_SECTIONS)
+    
+    def __init__(self, backend: str = 'iterparse'):
+        """
+        Args:
+            backend: 'iterparse' (lxml, or the stdlib fallback) or 'sax' (expat callbacks)
+        """
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown parser backend '{backend}', expected one of {BACKENDS}")
+        self.backend = backend
+        # Raw tag -> cleaned tag; documents reuse a small set of tags many times
+        self._tag_cache: Dict[str, str] = {}
+    
+    def parse_xml_to_json(self, xml_file_path: str, output_file_path: str,
+                          pretty: bool = False, compress: bool = False) -> Dict[str, Any]:
         """
         Parse XML file to JSON format
         
         Args:
             xml_file_path: Path to the input XML file
             output_file_path: Path to the output JSON file
+            pretty: Indent the JSON with 2 spaces instead of writing it compact
+            compress: Gzip the output file
+            
+        Returns:
+            The parsed data that was written, for further in-memory processing
         """
         try:
-            # Parse XML file
-            tree = ET.parse(xml_file_path)
-            root = tree.getroot()
-            
-            # Parse to dictionary
-            json_data = self._element_to_dict(root)
+            json_data = self.parse_xml_to_dict(xml_file_path)
             
             # Write JSON file
-            with open(output_file_path, 'w', encoding='utf-8') as f:
-                json.dump(json_data, f, indent=2, ensure_ascii=False)
+            write_json(json_data, output_file_path, pretty, compress)
             
             print(f"Successfully parsed {xml_file_path} to {output_file_path}")
+            return json_data
             
-        except ET.ParseError as e:
+        except XML_PARSE_ERRORS as e:
             print(f"Error parsing XML file: {e}")
             raise
         except Exception as e:
             print(f"Error parseing XML to JSON: {e}")
             raise
     
-    def _element_to_dict(self, element: ET.Element) -> Dict[str, Any]:
+    def parse_xml_to_dict(self, xml_file_path: str) -> Dict[str, Any]:
         """
-        Parse XML element to dictionary
+        Parse XML file to its dictionary representation
         
         Args:
-            element: XML element to parse
+            xml_file_path: Path to the input XML file
             
         Returns:
-            Dictionary representation of the element
+            Dictionary representation of the root element
+        """
+        # Bound cache memory to the tags of a single document
+        self._tag_cache.clear()
+        with open(xml_file_path, 'rb') as f:
+            if self.backend == 'sax':
+                with _gc_paused():
+                    return _SaxBuilder(self._tag_cache, self._clean_tag_name).parse(f)
+            return self._build_dict(self._iterparse(f))
+    
+    def parse_xml_to_structured(self, xml_file_path: str) -> Dict[str, Any]:
+        """
+        Parse XML file straight to structured loan data
+        
+        Only the subtrees the structured sections need are built; the rest of
+        the document is discarded as it streams past. The SAX backend builds
+        the full dictionary first.
+        
+        Args:
+            xml_file_path: Path to the input XML file
+            
+        Returns:
+            Structured loan data, as returned by _extract_loan_data
+        """
+        if self.backend == 'sax':
+            return self._extract_loan_data(self.parse_xml_to_dict(xml_file_path))
+        
+        self._tag_cache.clear()
+        with open(xml_file_path, 'rb') as f:
+            events = self._select(self._iterparse(f), self._LOAN_DATA_PATHS)
+            return self._extract_loan_data(self._build_dict(events))
+    
+    def _iterparse(self, source) -> Iterator[Tuple[str, Any]]:
+        """
+        Stream start/end events from an XML file, releasing each element
+        once it has been consumed so memory stays bounded by document depth
+        
+        Both backends pull fixed-size chunks through source.read(), so a plain
+        buffered file is used: feeding an mmap instead measured no faster and
+        would count the mapped input against resident memory.
+        
+        Args:
+            source: Binary file object to read from
+            
+        Yields:
+            (event, element) tuples where event is 'start' or 'end'
+        """
+        if LET is not None:
+            # Drop whitespace-only text between elements and skip ID bookkeeping.
+            # Comments and PIs are removed so the text around them merges into .text.
+            # lxml 5+ only resolves internal entities and never touches the network
+            events = LET.iterparse(
+                source,
+                events=('start', 'end'),
+                huge_tree=True,
+                recover=False,
+                remove_blank_text=True,
+                collect_ids=False,
+                remove_comments=True,
+                remove_pis=True
+            )
+            for event, elem in events:
+                yield event, elem
+                if event == 'end':
+                    elem.clear(keep_tail=False)
+                    # Drop already processed siblings so libxml2 can free them
+                    parent = elem.getparent()
+                    if parent is not None:
+                        while elem.getprevious() is not None:
+                            del parent[0]
+        else:
+            parents = []
+            for event, elem in ET.iterparse(source, events=('start', 'end')):
+                if event == 'start':
+                    parents.append(elem)
+                    yield event, elem
+                    continue
+                parents.pop()
+                yield event, elem
+                elem.clear()
+                # Detach the finished element; its earlier siblings are already gone
+                if parents:
+                    parents[-1].remove(elem)
+    
+    def _walk(self, element: ET.Element) -> Iterator[Tuple[str, ET.Element]]:
+        """
+        Generate start/end events for an in-memory element tree
+        
+        Args:
+            element: Root of the tree to walk
+            
+        Yields:
+            (event, element) tuples where event is 'start' or 'end'
+        """
+        # Explicit stack of (element, child iterator) so deep trees cannot
+        # exhaust the interpreter's recursion limit
+        yield 'start', element
+        stack = [(element, iter(element))]
+        while stack:
+            parent, children = stack[-1]
+            for child in children:
+                yield 'start', child
+                if not len(child):  # Leaf: nothing to descend into
+                    yield 'end', child
+                    continue
+                stack.append((child, iter(child)))
+                break
+            else:
+                # All children done; close the parent (post-order)
+                stack.pop()
+                yield 'end', parent
+    
+    def _select(self, events: Iterable[Tuple[str, Any]], paths) -> Iterator[Tuple[str, Any]]:
+        """
+        Filter start/end events down to the subtrees at the given key paths
+        
+        Args:
+            events: (event, element) tuples in document order
+            paths: Tuples of cleaned tag names below the root element
+            
+        Yields:
+            Events for the root, for the elements leading to each path and for
+            everything inside the selected subtrees
         """
-        result = {}
-        
-        # Add text content if present and not empty
-        if element.text and element.text.strip():
-            if len(element) == 0:  # Leaf node
-                return element.text.strip()
-            else:  # Has both text and children
-                result['#text'] = element.text.strip()
-        
-        # Process child elements
-        children = {}
-        for child in element:
-            child_dict = self._element_to_dict(child)
-            child_tag = self._clean_tag_name(child.tag)
+        prefixes = {path[:i] for path in paths for i in range(len(path))}
+        # Key path of each open element; None once inside a selected subtree
+        open_paths = []
+        skipping = 0
+        for event, elem in events:
+            if skipping:
+                skipping += 1 if event == 'start' else -1
+                continue
+            
+            if event == 'end':
+                open_paths.pop()
+                yield event, elem
+                continue
             
-            # Handle multiple children with same tag
-            if child_tag in children:
-                if not isinstance(children[child_tag], list):
-                    children[child_tag] = [children[child_tag]]
-                children[child_tag].append(child_dict)
+            if not open_paths:  # Root element
+                path = ()
+            elif open_paths[-1] is None:
+                path = None
             else:
-                children[child_tag] = child_dict
+                path = open_paths[-1] + (self._clean_tag_name(elem.tag),)
+                if path in paths:
+                    path = None
+                elif path not in prefixes:
+                    skipping = 1
+                    continue
+            open_paths.append(path)
+            yield event, elem
+    
+    def _build_dict(self, events: Iterable[Tuple[str, Any]]) -> Dict[str, Any]:
+        """
+        Build the dictionary representation of a document from start/end events
         
-        # Merge children into result
-        result.update(children)
+        Args:
+            events: (event, element) tuples in document order
+            
+        Returns:
+            Dictionary representation of the root element
+        """
+        # One tag -> [values] accumulator per open element; the bottom one collects the root
+        stack = [{}]
+        # Bind hot lookups once; this loop runs twice per element
+        push = stack.append
+        pop = stack.pop
+        tag_cache_get = self._tag_cache.get
+        clean_tag_name = self._clean_tag_name
+        node_value = _node_value
         
-        # If no attributes, text, or children, return empty string
-        if not result:
-            return ""
+        with _gc_paused():
+            for event, elem in events:
+                if event == 'start':
+                    push({})
+                    continue
+                
+                attrib = elem.attrib
+                if attrib:
+                    # Attribute names are namespaced like tags and share their cache
+                    attributes = {
+                        tag_cache_get(k) or clean_tag_name(k): v for k, v in attrib.items()
+                    }
+                else:
+                    attributes = None
+                value = node_value(elem.text, pop(), attributes)
+                
+                # Cache hits are resolved inline, without a method call
+                tag = tag_cache_get(elem.tag) or clean_tag_name(elem.tag)
+                # setdefault measures faster than defaultdict(list) here: most tags
+                # occur once per parent, so nearly every append would hit __missing__
+                stack[-1].setdefault(tag, []).append(value)
         
-        return result
+        return _root_value(stack[0])
+    
+    def _element_to_dict(self, element: ET.Element) -> Dict[str, Any]:
+        """
+        Parse XML element to dictionary
+        
+        Args:
+            element: XML element to parse
+            
+        Returns:
+            Dictionary representation of the element
+        """
+        return self._build_dict(self._walk(element))
     
     def _clean_tag_name(self, tag: str) -> str:
         """
@@ -104,10 +519,15 @@ class MISMOXMLToJSONParser:
         Returns:
             Cleaned tag name
         """
+        cached = self._tag_cache.get(tag)
+        if cached is not None:
+            return cached
+        
         # Remove namespace prefix if present
-        if '}' in tag:
-            return tag.split('}')[1]
-        return tag
+        idx = tag.find('}')
+        cleaned = tag if idx < 0 else tag[idx + 1:]
+        self._tag_cache[tag] = cleaned
+        return cleaned
     
     def _extract_loan_data(self, json_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -129,66 +549,7 @@ class MISMOXMLToJSONParser:
         }
         
         try:
-            # Extract message info
-            if 'ABOUT_VERSIONS' in json_data:
-                about_versions = json_data['ABOUT_VERSIONS']
-                if 'ABOUT_VERSION' in about_versions:
-                    about_version = about_versions['ABOUT_VERSION']
-                    if isinstance(about_version, list):
-                        about_version = about_version[0]
-                    loan_data['message_info'] = about_version
-            
-            # Extract deal info
-            if 'DEAL_SETS' in json_data:
-                deal_sets = json_data['DEAL_SETS']
-                if 'DEAL_SET' in deal_sets:
-                    deal_set = deal_sets['DEAL_SET']
-                    if isinstance(deal_set, list):
-                        deal_set = deal_set[0]
-                    
-                    if 'DEALS' in deal_set:
-                        deals = deal_set['DEALS']
-                        if 'DEAL' in deals:
-                            deal = deals['DEAL']
-                            if isinstance(deal, list):
-                                deal = deal[0]
-                            loan_data['deal_info'] = deal
-                            
-                            # Extract collaterals
-                            if 'COLLATERALS' in deal:
-                                collaterals = deal['COLLATERALS']
-                                if 'COLLATERAL' in collaterals:
-                                    collateral_list = collaterals['COLLATERAL']
-                                    if not isinstance(collateral_list, list):
-                                        collateral_list = [collateral_list]
-                                    loan_data['collaterals'] = collateral_list
-                            
-                            # Extract loans
-                            if 'LOANS' in deal:
-                                loans = deal['LOANS']
-                                if 'LOAN' in loans:
-                                    loan_list = loans['LOAN']
-                                    if not isinstance(loan_list, list):
-                                        loan_list = [loan_list]
-                                    loan_data['loans'] = loan_list
-                            
-                            # Extract parties
-                            if 'PARTIES' in deal:
-                                parties = deal['PARTIES']
-                                if 'PARTY' in parties:
-                                    party_list = parties['PARTY']
-                                    if not isinstance(party_list, list):
-                                        party_list = [party_list]
-                                    loan_data['parties'] = party_list
-            
-            # Extract relationships
-            if 'RELATIONSHIPS' in json_data:
-                relationships = json_data['RELATIONSHIPS']
-                if 'RELATIONSHIP' in relationships:
-                    relationship_list = relationships['RELATIONSHIP']
-                    if not isinstance(relationship_list, list):
-                        relationship_list = [relationship_list]
-                    loan_data['relationships'] = relationship_list
+            self._extract_loan_sections(json_data, loan_data)
         
         except Exception as e:
             print(f"Warning: Error extracting structured loan data: {e}")
@@ -196,6 +557,97 @@ class MISMOXMLToJSONParser:
         return loan_data
 
 
+# Container levels that write_json emits member by member; anything deeper
+# is handed to the encoder as one subtree
+STREAM_DEPTH = 4
+
+
+def _encode(obj: Any, pretty: bool = False) -> bytes:
+    """
+    Encode a value as UTF-8 JSON
+    
+    Uses orjson when available and falls back to the standard json module.
+    
+    Args:
+        obj: JSON-serializable value
+        pretty: Indent with 2 spaces instead of writing compact JSON
+        
+    Returns:
+        Encoded JSON bytes
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else None)
+    if pretty:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def _stream_dump(obj: Any, fp, pretty: bool = False, depth: int = 0, release: bool = False) -> None:
+    """
+    Incrementally write a value as JSON
+    
+    The top STREAM_DEPTH container levels are written one member at a time,
+    so only a single encoded subtree is held in memory at once.
+    
+    Args:
+        obj: JSON-serializable value
+        fp: Binary file object to write to
+        pretty: Indent with 2 spaces instead of writing compact JSON
+        depth: Nesting level of obj, used for indentation
+        release: Remove each member from obj once written so it can be freed
+    """
+    newline = b'\n' + b'  ' * depth if pretty else b''
+    if depth >= STREAM_DEPTH or not isinstance(obj, (dict, list)) or not obj:
+        chunk = _encode(obj, pretty)
+        # JSON strings never contain raw newlines, so this only re-indents
+        fp.write(chunk.replace(b'\n', newline) if pretty and depth else chunk)
+        return
+    
+    indent = newline + b'  ' if pretty else b''
+    separator = indent
+    if isinstance(obj, dict):
+        key_separator = b': ' if pretty else b':'
+        fp.write(b'{')
+        for key in list(obj):
+            value = obj.pop(key) if release else obj[key]
+            fp.write(separator + _encode(key) + key_separator)
+            _stream_dump(value, fp, pretty, depth + 1)
+            separator = b',' + indent
+        fp.write(newline + b'}')
+    else:
+        fp.write(b'[')
+        for i, value in enumerate(obj):
+            if release:
+                obj[i] = None
+            fp.write(separator)
+            _stream_dump(value, fp, pretty, depth + 1)
+            separator = b',' + indent
+        if release:
+            obj.clear()
+        fp.write(newline + b']')
+
+
+def write_json(data: Any, output_file_path: str, pretty: bool = False,
+               compress: bool = False, release: bool = False) -> None:
+    """
+    Write data to a UTF-8 JSON file
+    
+    Args:
+        data: JSON-serializable data
+        output_file_path: Path to the output JSON file
+        pretty: Indent with 2 spaces instead of writing compact JSON
+        compress: Gzip the output (fastest compression level)
+        release: Empty the top-level container while writing so each
+            subtree can be freed as soon as it is on disk
+    """
+    if compress:
+        f = gzip.open(output_file_path, 'wb', compresslevel=1)
+    else:
+        f = open(output_file_path, 'wb')
+    with f:
+        _stream_dump(data, f, pretty, release=release)
+
+
 def parse_arguments():
     """Parse command-line arguments"""
     parser = argparse.ArgumentParser(
@@ -205,16 +657,21 @@ def parse_arguments():
 Examples:
   %(prog)s                                    # Parse all .xml files in current directory
   %(prog)s input.xml                          # Creates input.json
+  %(prog)s a.xml b.xml -j 4                   # Parse several files in 4 processes
   %(prog)s input.xml -o output.json          # Custom output file
   %(prog)s input.xml --structured            # Also create structured version
   %(prog)s input.xml -s -o result.json       # Both options combined
+  %(prog)s input.xml --structured-only       # Only create input_structured.json
+  %(prog)s input.xml --pretty                # Indented, human-readable JSON
+  %(prog)s input.xml --gzip                  # Creates input.json.gz
+  %(prog)s input.xml --sax                   # Use the expat SAX backend
         '''
     )
     
     parser.add_argument(
         'input',
-        nargs='?',
-        help='Input XML file path (optional: if not provided, all .xml files in current directory will be parsed)'
+        nargs='*',
+        help='Input XML file path(s) (optional: if not provided, all .xml files in current directory will be parsed)'
     )
     
     parser.add_argument(
@@ -229,31 +686,66 @@ Examples:
         help='Also create a structured version with extracted loan data'
     )
     
+    parser.add_argument(
+        '--structured-only',
+        action='store_true',
+        help='Only create the structured version, extracting it while parsing'
+    )
+    
     parser.add_argument(
         '--structured-output',
         help='Custom path for structured output (default: adds _structured suffix)',
         default=None
     )
     
-    return parser.parse_args()
+    parser.add_argument(
+        '--sax',
+        action='store_true',
+        help='Parse with expat SAX callbacks instead of iterparse'
+    )
+    
+    parser.add_argument(
+        '-j', '--jobs',
+        type=int,
+        help='Number of worker processes for multiple files (default: number of CPUs)',
+        default=None
+    )
+    
+    parser.add_argument(
+        '--pretty',
+        action='store_true',
+        help='Indent the JSON output with 2 spaces (default: compact JSON)'
+    )
+    
+    parser.add_argument(
+        '--gzip',
+        action='store_true',
+        help='Gzip the JSON output (default names end in .json.gz)'
+    )
+    
+    args = parser.parse_args()
+    if args.jobs is not None and args.jobs < 1:
+        parser.error('--jobs must be at least 1')
+    return args
 
 
-def get_xml_files(input_path: str = None) -> List[str]:
+def get_xml_files(input_paths: List[str] = None) -> List[str]:
     """
     Get list of XML files to process
     
     Args:
-        input_path: Optional specific input file path
+        input_paths: Optional specific input file paths
         
     Returns:
         List of XML file paths to process
     """
-    if input_path:
-        # Validate input file
-        if not os.path.exists(input_path):
-            print(f"Error: Input file '{input_path}' not found.", file=sys.stderr)
-            sys.exit(1)
-        return [input_path]
+    if input_paths:
+        # Validate input files
+        for input_path in input_paths:
+            if not os.path.exists(input_path):
+                print(f"Error: Input file '{input_path}' not found.", file=sys.stderr)
+                sys.exit(1)
+        return list(input_paths)
     else:
         # Find all .xml files in current directory
         xml_files = glob.glob("*.xml")
@@ -272,37 +764,51 @@ def process_file(parser: MISMOXMLToJSONParser, xml_file: str, args: argparse.Nam
         xml_file: Path to XML file to process
         args: Command line arguments
     """
+    extension = '.json.gz' if args.gzip else '.json'
+    
     # Determine output file path
     if args.output:
         json_file = args.output
     else:
-        # Replace .xml extension with .json
+        # Replace .xml extension with .json (or .json.gz)
         base_name = os.path.splitext(xml_file)[0]
-        json_file = f"{base_name}.json"
+        json_file = f"{base_name}{extension}"
+    
+    # Determine structured output file path
+    if args.structured_output:
+        structured_file = args.structured_output
+    else:
+        if json_file.endswith(extension):
+            base_name = json_file[:-len(extension)]
+        else:
+            base_name = os.path.splitext(json_file)[0]
+        structured_file = f"{base_name}_structured{extension}"
     
     try:
-        # Parse XML to JSON
-        parser.parse_xml_to_json(xml_file, json_file)
+        if args.structured_only:
+            # Skip the full dictionary and extract while parsing
+            write_json(parser.parse_xml_to_structured(xml_file), structured_file, args.pretty, args.gzip)
+            print(f"Successfully parsed {xml_file} to {structured_file}")
+            return
+        
+        # Parse XML to a dictionary
+        json_data = parser.parse_xml_to_dict(xml_file)
+        
+        # Extract first: the structured data shares subtrees with json_data,
+        # which is emptied as it is written out
+        structured_data = parser._extract_loan_data(json_data) if args.structured else None
+        
+        write_json(json_data, json_file, args.pretty, args.gzip, release=True)
+        del json_data
+        print(f"Successfully parsed {xml_file} to {json_file}")
         
         # Create structured version if requested
-        if args.structured:
-            if args.structured_output:
-                structured_file = args.structured_output
-            else:
-                base_name = os.path.splitext(json_file)[0]
-                structured_file = f"{base_name}_structured.json"
-            
-            with open(json_file, 'r', encoding='utf-8') as f:
-                json_data = json.load(f)
-            
-            structured_data = parser._extract_loan_data(json_data)
-            
-            with open(structured_file, 'w', encoding='utf-8') as f:
-                json.dump(structured_data, f, indent=2, ensure_ascii=False)
+        if structured_data is not None:
+            write_json(structured_data, structured_file, args.pretty, args.gzip)
             
             print(f"Also created structured version: {structured_file}")
         
-    except ET.ParseError as e:
+    except XML_PARSE_ERRORS as e:
         print(f"Error: Invalid XML file '{xml_file}' - {e}", file=sys.stderr)
         raise
     except Exception as e:
@@ -310,6 +816,25 @@ def process_file(parser: MISMOXMLToJSONParser, xml_file: str, args: argparse.Nam
         raise
 
 
+def _process_one(task: Tuple[str, argparse.Namespace]) -> Tuple[str, Optional[str]]:
+    """
+    Process a single XML file with its own parser, e.g. in a worker process
+    
+    Args:
+        task: (XML file path, command line arguments for that file)
+        
+    Returns:
+        (XML file path, error message or None on success)
+    """
+    xml_file, args = task
+    parser = MISMOXMLToJSONParser(backend='sax' if args.sax else 'iterparse')
+    try:
+        process_file(parser, xml_file, args)
+    except Exception as e:
+        return xml_file, str(e)
+    return xml_file, None
+
+
 def main():
     """Main function to run the parser"""
     args = parse_arguments()
@@ -317,30 +842,32 @@ def main():
     # Get list of XML files to process
     xml_files = get_xml_files(args.input)
     
-    # Create parser instance
-    parser = MISMOXMLToJSONParser()
-    
-    # Process each XML file
-    errors = []
+    tasks = []
     for xml_file in xml_files:
-        try:
-            # For multiple files, output paths should be auto-generated (ignore --output and --structured-output)
-            if len(xml_files) > 1:
-                if args.output:
-                    print(f"Warning: --output option ignored when processing multiple files. Using default naming for {xml_file}")
-                if args.structured_output:
-                    print(f"Warning: --structured-output option ignored when processing multiple files. Using default naming for {xml_file}")
-                process_file(parser, xml_file, argparse.Namespace(
-                    output=None,
-                    structured=args.structured,
-                    structured_output=None
-                ))
-            else:
-                process_file(parser, xml_file, args)
-        except Exception as e:
-            errors.append((xml_file, str(e)))
+        # For multiple files, output paths should be auto-generated (ignore --output and --structured-output)
+        if len(xml_files) > 1:
+            if args.output:
+                print(f"Warning: --output option ignored when processing multiple files. Using default naming for {xml_file}")
+            if args.structured_output:
+                print(f"Warning: --structured-output option ignored when processing multiple files. Using default naming for {xml_file}")
+            tasks.append((xml_file, argparse.Namespace(
+                **{**vars(args), 'output': None, 'structured_output': None}
+            )))
+        else:
+            tasks.append((xml_file, args))
+    
+    # Files are independent, so spread them over worker processes
+    workers = min(args.jobs or os.cpu_count() or 1, len(tasks))
+    if workers > 1:
+        # Batch tasks per worker round trip to amortize pickling overhead
+        chunksize = max(1, len(tasks) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_process_one, tasks, chunksize=chunksize))
+    else:
+        results = [_process_one(task) for task in tasks]
     
     # Report any errors
+    errors = [(xml_file, error) for xml_file, error in results if error is not None]
     if errors:
         print(f"\nErrors occurred while processing {len(errors)} file(s):", file=sys.stderr)
         for xml_file, error in errors:
@@ -106,9 +106,10 @@ class TestMISMOXMLToJSONParser:
     def test_parser_initialization(self, parser):
         """Test that parser initializes with correct namespaces"""
         assert parser is not None
-        assert 'mismo' in parser.namespaces
-        assert 'xlink' in parser.namespaces
-        assert 'xsi' in parser.namespaces
+        assert 'mismo' in MISMOXMLToJSONParser.NAMESPACES
+        assert 'xlink' in MISMOXMLToJSONParser.NAMESPACES
+        assert 'xsi' in MISMOXMLToJSONParser.NAMESPACES
+        assert not hasattr(parser, '__dict__')
     
     def test_clean_tag_name_with_namespace(self, parser):
         """Test cleaning tag names with namespace prefixes"""
@@ -122,6 +123,13 @@ class TestMISMOXMLToJSONParser:
         cleaned = parser._clean_tag_name(tag_without_ns)
         assert cleaned == 'LoanAmount'
     
+    def test_clean_tag_name_is_cached(self, parser):
+        """Test that cleaned tag names are cached per raw tag"""
+        tag_with_ns = '{http://www.mismo.org/residential/2009/schemas}LoanAmount'
+        first = parser._clean_tag_name(tag_with_ns)
+        assert parser._tag_cache[tag_with_ns] == 'LoanAmount'
+        assert parser._clean_tag_name(tag_with_ns) is first
+    
     def test_parse_simple_xml(self, parser, temp_dir, sample_xml_simple):
         """Test parsing simple XML to JSON"""
         xml_file = os.path.join(temp_dir, 'simple.xml')
@@ -190,6 +198,69 @@ class TestMISMOXMLToJSONParser:
         assert data['person']['@attributes']['type'] == 'borrower'
         assert data['person']['name'] == 'John Doe'
     
+    def test_sax_backend_matches_iterparse(self, parser, temp_dir, sample_xml_simple,
+                                           sample_xml_with_namespaces):
+        """Test that the SAX backend builds the same dictionary as iterparse"""
+        sax_parser = MISMOXMLToJSONParser(backend='sax')
+        with_comments = '<r><a><!-- c -->text</a><b>x<!-- c -->y</b><p><?pi x?>text</p></r>'
+        for i, xml_content in enumerate([sample_xml_simple, sample_xml_with_namespaces,
+                                         with_comments]):
+            xml_file = os.path.join(temp_dir, f'sample{i}.xml')
+            with open(xml_file, 'w', encoding='utf-8') as f:
+                f.write(xml_content)
+            
+            assert sax_parser.parse_xml_to_dict(xml_file) == parser.parse_xml_to_dict(xml_file)
+    
+    def test_internal_entities_expanded_by_both_backends(self, parser, temp_dir):
+        """Test that both backends expand internal entities without losing text"""
+        xml_file = os.path.join(temp_dir, 'entities.xml')
+        with open(xml_file, 'w', encoding='utf-8') as f:
+            f.write('<!DOCTYPE r [<!ENTITY co "Acme Corp">]>'
+                    '<r><Name>&co; Inc</Name><N2>x &co;</N2></r>')
+        
+        expected = {'Name': 'Acme Corp Inc', 'N2': 'x Acme Corp'}
+        assert parser.parse_xml_to_dict(xml_file) == expected
+        assert MISMOXMLToJSONParser(backend='sax').parse_xml_to_dict(xml_file) == expected
+    
+    def test_sax_backend_text_before_children(self, temp_dir):
+        """Test that only text before the first child is kept, as with .text"""
+        xml_file = os.path.join(temp_dir, 'mixed.xml')
+        with open(xml_file, 'w', encoding='utf-8') as f:
+            f.write('<root> head <a>1</a> tail <a>2</a></root>')
+        
+        data = MISMOXMLToJSONParser(backend='sax').parse_xml_to_dict(xml_file)
+        assert data == {'#text': 'head', 'a': ['1', '2']}
+    
+    def test_sax_backend_invalid_xml(self, temp_dir):
+        """Test that the SAX backend raises on invalid XML"""
+        xml_file = os.path.join(temp_dir, 'invalid.xml')
+        json_file = os.path.join(temp_dir, 'invalid.json')
+        with open(xml_file, 'w', encoding='utf-8') as f:
+            f.write('<?xml version="1.0"?><root><unclosed>')
+        
+        with pytest.raises(Exception):
+            MISMOXMLToJSONParser(backend='sax').parse_xml_to_json(xml_file, json_file)
+    
+    def test_unknown_backend(self):
+        """Test that an unknown backend name is rejected"""
+        with pytest.raises(ValueError):
+            MISMOXMLToJSONParser(backend='dom')
+    
+    @pytest.mark.parametrize('backend', ['iterparse', 'sax'])
+    def test_attributes_on_leaves_and_namespaced_names(self, temp_dir, backend):
+        """Test that leaf attributes keep the text and attribute names lose namespaces"""
+        xml_file = os.path.join(temp_dir, 'leaf_attributes.xml')
+        with open(xml_file, 'w', encoding='utf-8') as f:
+            f.write('<root xmlns:xlink="http://www.w3.org/1999/xlink">'
+                    '<LOAN xlink:label="LOAN_1"><Amount currency="USD">100</Amount>'
+                    '<Empty flag="y"/></LOAN></root>')
+        
+        data = MISMOXMLToJSONParser(backend=backend).parse_xml_to_dict(xml_file)
+        
+        assert data['LOAN']['@attributes'] == {'label': 'LOAN_1'}
+        assert data['LOAN']['Amount'] == {'@attributes': {'currency': 'USD'}, '#text': '100'}
+        assert data['LOAN']['Empty'] == {'@attributes': {'flag': 'y'}}
+    
     def test_parse_invalid_xml(self, parser, temp_dir):
         """Test parsing invalid XML raises appropriate error"""
         xml_file = os.path.join(temp_dir, 'invalid.xml')
@@ -219,10 +290,10 @@ class TestMISMOXMLToJSONParser:
         with open(xml_file, 'w', encoding='utf-8') as f:
             f.write(sample_xml_mismo_structure)
         
-        parser.parse_xml_to_json(xml_file, json_file)
+        json_data = parser.parse_xml_to_json(xml_file, json_file)
         
         with open(json_file, 'r', encoding='utf-8') as f:
-            json_data = json.load(f)
+            assert json.load(f) == json_data
         
         structured_data = parser._extract_loan_data(json_data)
         
@@ -245,6 +316,25 @@ class TestMISMOXMLToJSONParser:
         assert len(structured_data['parties']) == 1
         assert structured_data['parties'][0]['Name'] == 'John Doe'
     
+    def test_parse_xml_to_structured(self, parser, temp_dir, sample_xml_mismo_structure):
+        """Test that streaming extraction matches extracting from the full dict"""
+        xml_file = os.path.join(temp_dir, 'mismo.xml')
+        
+        # Add sections the structured output does not use
+        xml_content = sample_xml_mismo_structure.replace(
+            '</MESSAGE>',
+            '<DOCUMENT_SETS><DOCUMENT_SET>ignored</DOCUMENT_SET></DOCUMENT_SETS>'
+            '<RELATIONSHIPS><RELATIONSHIP><From>a</From></RELATIONSHIP></RELATIONSHIPS></MESSAGE>'
+        )
+        with open(xml_file, 'w', encoding='utf-8') as f:
+            f.write(xml_content)
+        
+        expected = parser._extract_loan_data(parser.parse_xml_to_dict(xml_file))
+        structured_data = parser.parse_xml_to_structured(xml_file)
+        
+        assert structured_data == expected
+        assert structured_data['relationships'] == [{'From': 'a'}]
+    
     def test_extract_loan_data_with_missing_fields(self, parser):
         """Test extracting loan data when fields are missing"""
         # Empty data
@@ -256,6 +346,22 @@ class TestMISMOXMLToJSONParser:
         assert 'collaterals' in result
         assert result['collaterals'] == []
     
+    def test_extract_loan_data_repeated_items(self, parser):
+        """Test that repeated deals use the first item and single loans become lists"""
+        json_data = {
+            'DEAL_SETS': {'DEAL_SET': [
+                {'DEALS': {'DEAL': [{'LOANS': {'LOAN': {'LoanAmount': '1'}}}, {}]}},
+                {'DEALS': {'DEAL': {'LOANS': {'LOAN': {'LoanAmount': '2'}}}}}
+            ]},
+            'RELATIONSHIPS': {'RELATIONSHIP': [{'From': 'a'}, {'From': 'b'}]}
+        }
+        result = parser._extract_loan_data(json_data)
+        
+        assert result['loans'] == [{'LoanAmount': '1'}]
+        assert result['deal_info'] == {'LOANS': {'LOAN': {'LoanAmount': '1'}}}
+        assert len(result['relationships']) == 2
+        assert result['parties'] == []
+    
     def test_element_to_dict_empty_element(self, parser):
         """Test converting empty XML element to dict"""
         import xml.etree.ElementTree as ET
@@ -270,6 +376,26 @@ class TestMISMOXMLToJSONParser:
         result = parser._element_to_dict(element)
         assert result == "Some content"
     
+    def test_comments_and_pis_keep_surrounding_text(self, parser, temp_dir):
+        """Test that text after a comment or processing instruction is not lost"""
+        xml_file = os.path.join(temp_dir, 'comments.xml')
+        with open(xml_file, 'w', encoding='utf-8') as f:
+            f.write('<r><a><!-- c -->text</a><b>x<!-- c -->y</b><p><?pi x?>text</p></r>')
+        
+        data = parser.parse_xml_to_dict(xml_file)
+        assert data == {'a': 'text', 'b': 'xy', 'p': 'text'}
+    
+    def test_element_to_dict_deeply_nested(self, parser):
+        """Test that deep nesting does not hit the recursion limit"""
+        import sys
+        import xml.etree.ElementTree as ET
+        depth = sys.getrecursionlimit() * 2
+        element = ET.fromstring('<a>' * depth + 'leaf' + '</a>' * depth)
+        result = parser._element_to_dict(element)
+        for _ in range(depth - 1):
+            result = result['a']
+        assert result == 'leaf'
+    
     def test_duplicate_child_elements(self, parser, temp_dir):
         """Test handling of duplicate child elements"""
         xml_content = '''<?xml version="1.0" encoding="UTF-8"?>
@@ -298,6 +424,56 @@ class TestMISMOXMLToJSONParser:
         assert data['item'][2] == 'Third'
 
 
+class TestJSONHelpers:
+    """Test suite for the JSON write helper"""
+    
+    def test_write_json_matches_stdlib_fallback(self, temp_dir, monkeypatch):
+        """Test that orjson and stdlib json produce the same file"""
+        import main
+        data = {'name': 'José', 'items': ['1', '2'], 'empty': ''}
+        fast_file = os.path.join(temp_dir, 'fast.json')
+        slow_file = os.path.join(temp_dir, 'slow.json')
+        
+        main.write_json(data, fast_file)
+        monkeypatch.setattr(main, 'orjson', None)
+        main.write_json(data, slow_file)
+        
+        with open(fast_file, 'rb') as f_fast, open(slow_file, 'rb') as f_slow:
+            assert f_fast.read() == f_slow.read()
+    
+    @pytest.mark.parametrize('pretty', [False, True])
+    def test_write_json_streams_nested_data(self, temp_dir, pretty):
+        """Test that streamed output matches json.dumps and releases the root"""
+        import main
+        nested = {'leaf': 'x'}
+        for _ in range(main.STREAM_DEPTH + 2):
+            nested = {'list': [nested, 'y', {}], 'empty': []}
+        data = {'root': nested, 'other': 'z'}
+        if pretty:
+            expected = json.dumps(data, indent=2, ensure_ascii=False)
+        else:
+            expected = json.dumps(data, separators=(',', ':'), ensure_ascii=False)
+        json_file = os.path.join(temp_dir, 'nested.json')
+        
+        main.write_json(data, json_file, pretty=pretty, release=True)
+        
+        with open(json_file, 'r', encoding='utf-8') as f:
+            assert f.read() == expected
+        assert data == {}
+    
+    def test_write_json_gzip(self, temp_dir):
+        """Test that compressed output decompresses to the same data"""
+        import gzip
+        import main
+        data = {'items': ['1', '2'], 'name': 'José'}
+        json_file = os.path.join(temp_dir, 'data.json.gz')
+        
+        main.write_json(data, json_file, compress=True)
+        
+        with gzip.open(json_file, 'rt', encoding='utf-8') as f:
+            assert json.load(f) == data
+
+
 class TestCLIIntegration:
     """Integration tests for command-line interface"""
     
@@ -313,6 +489,67 @@ class TestCLIIntegration:
         assert 'MISMO XML' in result.stdout
         assert '--output' in result.stdout
         assert '--structured' in result.stdout
+    
+    def test_structured_output(self, temp_dir, sample_xml_mismo_structure):
+        """Test that --structured writes both the raw and structured files"""
+        import subprocess
+        xml_file = os.path.join(temp_dir, 'mismo.xml')
+        with open(xml_file, 'w', encoding='utf-8') as f:
+            f.write(sample_xml_mismo_structure)
+        
+        result = subprocess.run(
+            ['python', 'main.py', xml_file, '--structured'],
+            capture_output=True,
+            text=True
+        )
+        assert result.returncode == 0
+        
+        with open(os.path.join(temp_dir, 'mismo.json'), 'r', encoding='utf-8') as f:
+            assert 'DEAL_SETS' in json.load(f)
+        with open(os.path.join(temp_dir, 'mismo_structured.json'), 'r', encoding='utf-8') as f:
+            structured_data = json.load(f)
+        assert structured_data['loans'][0]['LoanAmount'] == '250000'
+        assert structured_data['message_info']['DataVersionIdentifier'] == '3.4'
+    
+    def test_multiple_files_in_parallel(self, temp_dir, sample_xml_simple):
+        """Test that several input files are each converted with -j"""
+        import subprocess
+        xml_files = []
+        for name in ('first', 'second', 'third'):
+            xml_file = os.path.join(temp_dir, f'{name}.xml')
+            with open(xml_file, 'w', encoding='utf-8') as f:
+                f.write(sample_xml_simple)
+            xml_files.append(xml_file)
+        
+        result = subprocess.run(
+            ['python', 'main.py', *xml_files, '-j', '2'],
+            capture_output=True,
+            text=True
+        )
+        assert result.returncode == 0
+        
+        for name in ('first', 'second', 'third'):
+            with open(os.path.join(temp_dir, f'{name}.json'), 'r', encoding='utf-8') as f:
+                assert json.load(f)['name'] == 'Test Name'
+    
+    def test_multiple_files_reports_errors(self, temp_dir, sample_xml_simple):
+        """Test that a bad file fails the run without stopping the others"""
+        import subprocess
+        good_file = os.path.join(temp_dir, 'good.xml')
+        bad_file = os.path.join(temp_dir, 'bad.xml')
+        with open(good_file, 'w', encoding='utf-8') as f:
+            f.write(sample_xml_simple)
+        with open(bad_file, 'w', encoding='utf-8') as f:
+            f.write('<root><unclosed>')
+        
+        result = subprocess.run(
+            ['python', 'main.py', bad_file, good_file, '-j', '2'],
+            capture_output=True,
+            text=True
+        )
+        assert result.returncode == 1
+        assert 'bad.xml' in result.stderr
+        assert os.path.exists(os.path.join(temp_dir, 'good.json'))
 
 
 if __name__ == '__main__':